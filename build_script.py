@@ -10,28 +10,36 @@ import subprocess
 import argparse
 from pathlib import Path
 
-# .env 파일 로드
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    print("⚠️  python-dotenv가 설치되지 않았습니다. pip install python-dotenv")
-    print("   환경 변수를 수동으로 설정해주세요.")
+def load_env():
+    """.env 파일 로드 (업로드 토큰이 필요할 때만 호출)"""
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        print("⚠️  python-dotenv가 설치되지 않았습니다. pip install python-dotenv")
+        print("   환경 변수를 수동으로 설정해주세요.")
 
-def run_command(cmd, description="", check=True):
-    """명령어 실행"""
+def run_command(cmd, description="", check=True, capture=False):
+    """
+    명령어 실행 (cmd는 argv 리스트, 셸을 거치지 않음)
+    
+    capture=False이면 출력을 버퍼링하지 않고 터미널로 바로 흘려보냄
+    """
     print(f"📋 {description}")
-    print(f"🔧 실행: {cmd}")
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+    print(f"🔧 실행: {' '.join(cmd)}")
+    result = subprocess.run(cmd, capture_output=capture, text=True)
     
     if result.returncode != 0 and check:
-        print(f"❌ 실패: {result.stderr}")
+        if capture:
+            print(f"❌ 실패: {result.stderr}")
+        else:
+            print(f"❌ 실패 (종료 코드: {result.returncode})")
         if not input("계속 진행하시겠습니까? (y/N): ").lower().startswith('y'):
             sys.exit(1)
         return False
     else:
         print(f"✅ 성공")
-        if result.stdout.strip():
+        if capture and result.stdout.strip():
             # 긴 출력은 줄여서 표시
             output = result.stdout.strip()
             if len(output) > 300:
@@ -40,40 +48,59 @@ def run_command(cmd, description="", check=True):
     print()
     return True
 
+# 빌드 간 재사용되는 캐시 디렉토리
+BUILD_CACHE_DIR = Path(".build_cache")
+
+def dist_files():
+    """dist/ 내 배포 파일 목록 (셸 glob 대신 사용)"""
+    return sorted(str(path) for path in Path("dist").glob("*") if path.is_file())
+
+# __pycache__ 탐색 시 내려가지 않을 디렉토리 (숨김 디렉토리도 모두 건너뜀)
+SKIP_DIRS = {".git", "venv", ".venv", "node_modules", "build", "dist"}
+
+def remove_path(path):
+    """파일 또는 디렉토리 삭제"""
+    print(f"   🗑️  {path}")
+    if path.is_dir():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink()
+
 def clean_build():
     """빌드 디렉토리 정리"""
     print("🧹 빌드 디렉토리 정리...")
     
-    dirs_to_clean = ["build", "dist", "*.egg-info", "**/__pycache__"]
-    for pattern in dirs_to_clean:
-        for path in Path(".").glob(pattern):
-            if path.is_dir():
-                print(f"   🗑️  {path}")
-                shutil.rmtree(path)
-            elif path.is_file():
-                print(f"   🗑️  {path}")
-                path.unlink()
-    
-    # src 디렉토리 내 egg-info도 정리
-    for path in Path("src").glob("*.egg-info"):
-        if path.is_dir():
-            print(f"   🗑️  {path}")
-            shutil.rmtree(path)
+    for name in ("build", "dist"):
+        path = Path(name)
+        if path.exists():
+            remove_path(path)
+    
+    # 루트 및 src 디렉토리의 egg-info (비재귀)
+    for root in (Path("."), Path("src")):
+        for path in root.glob("*.egg-info"):
+            remove_path(path)
+    
+    # __pycache__ 정리 (.git, .tox 등 숨김 디렉토리와 가상환경은 건너뜀)
+    for dirpath, dirnames, _ in os.walk(".", topdown=True):
+        dirnames[:] = [
+            d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")
+        ]
+        if "__pycache__" in dirnames:
+            dirnames.remove("__pycache__")
+            remove_path(Path(dirpath) / "__pycache__")
     print()
 
 def check_requirements():
     """필수 도구 확인"""
     print("🔍 필수 도구 확인...")
     
+    # Python과 pip는 sys.executable로 실행하므로 PATH에 없어도 됨
     required_tools = [
-        ("python", "Python 인터프리터"),
-        ("pip", "Python 패키지 관리자"),
         ("git", "Git 버전 관리")
     ]
     
     for tool, desc in required_tools:
-        result = subprocess.run(f"which {tool}", shell=True, capture_output=True)
-        if result.returncode != 0:
+        if shutil.which(tool) is None:
             print(f"❌ {tool}이 설치되지 않았습니다 ({desc})")
             sys.exit(1)
         else:
@@ -84,18 +111,46 @@ def install_build_tools():
     """빌드 도구 설치"""
     print("🔧 빌드 도구 설치...")
     tools = ["build", "twine", "wheel", "setuptools"]
-    for tool in tools:
-        run_command(f"pip install --upgrade {tool}", f"{tool} 설치/업그레이드")
+    # pip 실행 한 번으로 모든 도구를 함께 설치/업그레이드
+    run_command(
+        [sys.executable, "-m", "pip", "install", "--upgrade", *tools],
+        f"{', '.join(tools)} 설치/업그레이드"
+    )
 
 def build_package():
     """패키지 빌드"""
     print("📦 패키지 빌드...")
-    return run_command("python -m build", "패키지 빌드 실행")
+    return run_command([sys.executable, "-m", "build"], "패키지 빌드 실행")
+
+def dist_hash(files):
+    """배포 파일 이름과 내용의 SHA-256 해시"""
+    import hashlib
+    
+    digest = hashlib.sha256()
+    for name in files:
+        path = Path(name)
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
 
 def check_package():
-    """패키지 검증"""
+    """패키지 검증 (이전에 검증한 파일과 동일하면 생략)"""
     print("🔍 패키지 검증...")
-    return run_command("python -m twine check dist/*", "패키지 검증")
+    files = dist_files()
+    cache_file = BUILD_CACHE_DIR / "last_checked"
+    digest = dist_hash(files)
+    
+    if files and cache_file.exists() and cache_file.read_text().strip() == digest:
+        print("✅ 이전에 검증된 파일과 동일 - 검증 생략 (cached)")
+        print()
+        return True
+    
+    if not run_command([sys.executable, "-m", "twine", "check", *files], "패키지 검증"):
+        return False
+    
+    BUILD_CACHE_DIR.mkdir(exist_ok=True)
+    cache_file.write_text(digest)
+    return True
 
 def show_results():
     """결과 표시"""
@@ -124,17 +179,26 @@ def test_local_install():
     
     # 테스트 환경에서 설치
     print(f"   📦 설치: {wheel_file}")
-    success = run_command(f"pip install --force-reinstall {wheel_file}", "패키지 설치", check=False)
+    success = run_command(
+        [sys.executable, "-m", "pip", "install", "--force-reinstall", str(wheel_file)],
+        "패키지 설치",
+        check=False
+    )
     
     if success:
         # import 테스트
-        test_cmd = (
-            "python -c \"import vertex_ai_imagen; "
+        test_code = (
+            "import vertex_ai_imagen; "
             "print(f'✅ 버전: {vertex_ai_imagen.__version__}'); "
             "from vertex_ai_imagen import ImagenClient; "
-            "print('✅ 모든 클래스 import 성공')\""
+            "print('✅ 모든 클래스 import 성공')"
+        )
+        return run_command(
+            [sys.executable, "-c", test_code],
+            "패키지 import 테스트",
+            check=False,
+            capture=True
         )
-        return run_command(test_cmd, "패키지 import 테스트", check=False)
     
     return False
 
@@ -146,6 +210,7 @@ def upload_to_pypi(test_only=False):
     print(f"📤 {repo_name} 업로드...")
     
     # .env에서 API 토큰 읽기
+    load_env()
     token_env = "TESTPYPI_API_TOKEN" if test_only else "PYPI_API_TOKEN"
     api_token = os.getenv(token_env)
     
@@ -184,10 +249,10 @@ def upload_to_pypi(test_only=False):
             password = None
     
     if test_only:
-        cmd_base = "python -m twine upload --repository testpypi"
+        cmd_base = [sys.executable, "-m", "twine", "upload", "--repository", "testpypi"]
         print("   ⚠️  Test PyPI에 업로드합니다 (테스트 목적)")
     else:
-        cmd_base = "python -m twine upload"
+        cmd_base = [sys.executable, "-m", "twine", "upload"]
         print("   🚨 실제 PyPI에 업로드합니다!")
         confirm = input("   정말 진행하시겠습니까? (yes 입력): ")
         if confirm != "yes":
@@ -200,25 +265,20 @@ def upload_to_pypi(test_only=False):
         env = os.environ.copy()
         env['TWINE_USERNAME'] = username
         env['TWINE_PASSWORD'] = password
-        cmd = f"{cmd_base} dist/*"
+        cmd = cmd_base + dist_files()
         print("   🔐 자동 인증으로 업로드")
         
         # 환경 변수를 사용한 실행
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, env=env)
+        result = subprocess.run(cmd, env=env)
         
         if result.returncode == 0:
             print("✅ 성공")
-            if result.stdout.strip():
-                output = result.stdout.strip()
-                if len(output) > 300:
-                    output = output[:300] + "..."
-                print(f"📄 출력: {output}")
             return True
         else:
-            print(f"❌ 실패: {result.stderr}")
+            print(f"❌ 실패 (종료 코드: {result.returncode})")
             return False
     else:
-        cmd = f"{cmd_base} dist/*"
+        cmd = cmd_base + dist_files()
         print("   🔐 수동 인증 필요 (사용자명/비밀번호 입력)")
         return run_command(cmd, f"{repo_name} 업로드 실행", check=False)
 
@@ -67,8 +67,9 @@ async def test_image_generation():
         
         # 3. Create output directory
         print("📁 3. Creating output directory...")
-        Path(OUTPUT_DIR).mkdir(exist_ok=True)
-        print(f"   ✅ Directory: {OUTPUT_DIR}")
+        output_dir = Path(OUTPUT_DIR)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        print(f"   ✅ Directory: {output_dir}")
         
         # 4. Simple image generation test
         print("🎯 4. Image generation test...")
@@ -88,7 +89,7 @@ async def test_image_generation():
         
         # 5. Save image
         print("💾 5. Saving image...")
-        filename = f"{OUTPUT_DIR}/test_sunset.png"
+        filename = output_dir / "test_sunset.png"
         image.save(filename)
         
         print(f"   ✅ Save completed: {filename}")
@@ -110,14 +111,16 @@ async def test_image_generation():
         
         print(f"   ✅ Generated {len(images)} images successfully!")
         
-        # 7. Save images
-        for i, img in enumerate(images):
-            filename = f"{OUTPUT_DIR}/test_cat_{i+1}.png"
-            img.save(filename)
+        # 7. Save images (concurrently, off the event loop)
+        filenames = [output_dir / f"test_cat_{i+1}.png" for i in range(len(images))]
+        await asyncio.gather(*(
+            img.save_async(filename) for img, filename in zip(images, filenames)
+        ))
+        for img, filename in zip(images, filenames):
             print(f"   💾 Saved: {filename} ({img.size:,} bytes)")
         
         print("\n🎉 All tests completed!")
-        print(f"📁 Check generated files at: {OUTPUT_DIR}/")
+        print(f"📁 Check generated files at: {output_dir}/")
         
         # 8. List supported models
         print("\n📋 Supported models:")
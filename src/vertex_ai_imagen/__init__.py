@@ -10,13 +10,14 @@ __email__ = "kevinpark1981@gmail.com"
 __description__ = "Simple and clean Python client for Google Cloud Vertex AI Imagen"
 
 from .client import ImagenClient
-from .models import GeneratedImage, ImageRequest
+from .models import GeneratedImage, ImageRequest, clear_image_cache
 from .exceptions import ImagenError, AuthenticationError
 
 __all__ = [
     "ImagenClient",
     "GeneratedImage", 
     "ImageRequest",
+    "clear_image_cache",
     "ImagenError",
     "AuthenticationError",
 ]
@@ -5,10 +5,12 @@ Vertex AI Imagen 클라이언트
 import asyncio
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Union
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
     from google.oauth2 import service_account
     from google.auth.transport.requests import Request
 except ImportError:
@@ -17,35 +19,98 @@ except ImportError:
         "pip install requests google-auth google-auth-oauthlib google-auth-httplib2"
     )
 
-from .models import GeneratedImage, ImageRequest
+# 선택적 고속 JSON 라이브러리 (없으면 표준 json 사용)
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    import json
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+from .models import GeneratedImage, ImageRequest, make_generated_image
 from .exceptions import ImagenError, AuthenticationError, APIError, ValidationError
 
 logger = logging.getLogger(__name__)
 
+# 기본 동시 API 호출 수 (asyncio 기본 executor와 같은 min(32, CPU 수 + 4))
+_DEFAULT_MAX_CONNECTIONS = min(32, (os.cpu_count() or 1) + 4)
+
+# 지원되는 모델 목록 (list_models() 반환 순서)
+_MODELS = (
+    "imagegeneration@006",
+    "imagegeneration@005",
+    "imagegeneration@002",
+    "imagen-3.0-generate-001",
+    "imagen-3.0-generate-002",
+    "imagen-3.0-fast-generate-001",
+)
+
 class ImagenClient:
     """Vertex AI Imagen 클라이언트"""
     
-    # 지원되는 모델 목록
-    SUPPORTED_MODELS = [
-        "imagegeneration@006",
-        "imagegeneration@005", 
-        "imagegeneration@002",
-        "imagen-3.0-generate-001",
-        "imagen-3.0-generate-002",
-        "imagen-3.0-fast-generate-001"
-    ]
+    # 지원되는 모델 집합 (O(1) 검증용)
+    SUPPORTED_MODELS = frozenset(_MODELS)
     
-    def __init__(self, project_id: str, location: str = "us-central1"):
+    def __init__(
+        self,
+        project_id: str,
+        location: str = "us-central1",
+        max_connections: Optional[int] = None
+    ):
         """
         Args:
             project_id: Google Cloud 프로젝트 ID
             location: Vertex AI 리전 (기본값: us-central1)
+            max_connections: 동시 API 호출 수 (HTTP 연결 풀 및 스레드 수,
+                기본값: min(32, CPU 수 + 4))
         """
+        if max_connections is None:
+            max_connections = _DEFAULT_MAX_CONNECTIONS
+        if max_connections < 1:
+            raise ValueError("max_connections는 1 이상이어야 합니다")
+        
         self.project_id = project_id
         self.location = location
+        self.max_connections = max_connections
         self.credentials = None
         self.base_url = f"https://{location}-aiplatform.googleapis.com/v1"
         
+        # 모델별 예측 엔드포인트 URL 미리 계산
+        self._model_urls = {
+            model: self._predict_url(model) for model in self.SUPPORTED_MODELS
+        }
+        
+        # 이벤트 루프가 생긴 뒤에 만들어야 하므로 _ensure_token()에서 지연 생성
+        self._token_lock: Optional[asyncio.Lock] = None
+        self._token_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # 토큰이 바뀔 때만 다시 만드는 요청 헤더
+        self._headers: dict = {}
+        self._headers_token: Optional[str] = None
+        
+        # 연결 재사용을 위한 HTTP 세션 (TLS 핸드셰이크를 호출마다 반복하지 않음)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=max_connections, pool_maxsize=max_connections
+        )
+        self._session.mount("https://", adapter)
+        
+        # 장시간 걸리는 API 호출이 기본 executor를 점유하지 않도록 전용 스레드 풀 사용
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_connections, thread_name_prefix="imagen"
+        )
+        
+    def _predict_url(self, model: str) -> str:
+        """모델의 예측 엔드포인트 URL"""
+        return (
+            f"{self.base_url}/projects/{self.project_id}/locations/{self.location}/"
+            f"publishers/google/models/{model}:predict"
+        )
+    
     def setup_credentials(self, key_path: str) -> bool:
         """
         서비스 계정 키로 인증 설정
@@ -101,7 +166,8 @@ class ImagenClient:
         negative_prompt: Optional[str] = None,
         seed: Optional[int] = None,
         safety_setting: str = "block_medium_and_above",
-        enhance_prompt: bool = True
+        enhance_prompt: bool = True,
+        parallel: bool = False
     ) -> Union[GeneratedImage, List[GeneratedImage]]:
         """
         이미지 생성 - 깔끔한 API
@@ -115,6 +181,7 @@ class ImagenClient:
             seed: 재현성을 위한 시드
             safety_setting: 안전 필터 수준
             enhance_prompt: 프롬프트 자동 개선 여부
+            parallel: count>1일 때 이미지마다 별도 요청을 동시에 전송
             
         Returns:
             count=1이면 GeneratedImage, 그 외에는 List[GeneratedImage]
@@ -138,6 +205,30 @@ class ImagenClient:
         if request.model not in self.SUPPORTED_MODELS:
             raise ValidationError(f"지원되지 않는 모델: {request.model}")
         
+        # 이미지별 단일 요청을 동시에 전송
+        if parallel and count > 1:
+            tasks = [
+                asyncio.ensure_future(self.generate(
+                    prompt,
+                    model=model,
+                    aspect_ratio=aspect_ratio,
+                    count=1,
+                    negative_prompt=negative_prompt,
+                    seed=None if seed is None else seed + i,
+                    safety_setting=safety_setting,
+                    enhance_prompt=enhance_prompt
+                ))
+                for i in range(count)
+            ]
+            try:
+                return list(await asyncio.gather(*tasks))
+            except BaseException:
+                # 하나라도 실패하면 아직 진행 중인 요청은 기다리지 않고 취소
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+        
         # API 호출
         try:
             result = await self._call_api(request)
@@ -147,7 +238,7 @@ class ImagenClient:
             if not predictions:
                 raise APIError("이미지가 생성되지 않았습니다")
             
-            images = [GeneratedImage.from_api_response(pred) for pred in predictions]
+            images = [make_generated_image(pred) for pred in predictions]
             
             logger.info(f"이미지 {len(images)}개 생성 완료")
             
@@ -159,56 +250,121 @@ class ImagenClient:
             else:
                 raise APIError(f"이미지 생성 실패: {e}")
     
+    async def warmup(self) -> None:
+        """
+        첫 generate() 호출 지연을 줄이기 위한 사전 준비
+        
+        액세스 토큰을 확인하고 API 호스트에 미리 연결해
+        DNS 조회 및 TLS 핸드셰이크 비용을 먼저 처리합니다.
+        setup_credentials() 이후에 호출하세요.
+        """
+        if not self.credentials:
+            raise AuthenticationError("인증이 설정되지 않았습니다. setup_credentials() 호출 필요")
+        
+        await self._ensure_token()
+        
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(
+                self._executor,
+                lambda: self._session.head(self.base_url, timeout=10)
+            )
+        except requests.RequestException as e:
+            logger.warning(f"API 연결 준비 실패: {e}")
+    
+    async def _ensure_token(self) -> dict:
+        """
+        만료된 액세스 토큰 갱신 (동시 호출 시 한 번만 갱신)
+        
+        Returns:
+            dict: 현재 토큰이 반영된 요청 헤더
+        """
+        # asyncio.Lock은 처음 사용한 이벤트 루프에 묶이므로 루프가 바뀌면 새로 생성
+        # (같은 클라이언트를 여러 asyncio.run() 호출에서 재사용하는 경우)
+        loop = asyncio.get_running_loop()
+        if self._token_lock is None or self._token_lock_loop is not loop:
+            self._token_lock = asyncio.Lock()
+            self._token_lock_loop = loop
+        
+        async with self._token_lock:
+            if not self.credentials.valid or self.credentials.expired:
+                try:
+                    await loop.run_in_executor(
+                        self._executor,
+                        self.credentials.refresh,
+                        Request(self._session)
+                    )
+                except Exception as e:
+                    raise AuthenticationError(f"토큰 갱신 실패: {e}")
+                logger.debug("액세스 토큰 갱신 완료")
+            
+            token = self.credentials.token
+            if token != self._headers_token:
+                self._headers = {
+                    "Authorization": f"Bearer {token}",
+                    "Content-Type": "application/json"
+                }
+                self._headers_token = token
+            
+            return self._headers
+    
     async def _call_api(self, request: ImageRequest) -> dict:
         """실제 API 호출"""
-        url = (
-            f"{self.base_url}/projects/{self.project_id}/locations/{self.location}/"
-            f"publishers/google/models/{request.model}:predict"
-        )
+        url = self._model_urls.get(request.model) or self._predict_url(request.model)
         
-        # 요청 데이터 구성
-        request_data = {
-            "instances": [{"prompt": request.prompt}],
-            "parameters": {
-                "sampleCount": request.count,
-                "aspectRatio": request.aspect_ratio,
-                "addWatermark": False,
-                "enhancePrompt": request.enhance_prompt
-            }
+        # 요청 매개변수 구성
+        parameters = {
+            "sampleCount": request.count,
+            "aspectRatio": request.aspect_ratio,
+            "addWatermark": False,
+            "enhancePrompt": request.enhance_prompt
         }
         
         # 선택적 매개변수 추가
         if request.negative_prompt:
-            request_data["parameters"]["negativePrompt"] = request.negative_prompt
+            parameters["negativePrompt"] = request.negative_prompt
         
         if request.safety_setting:
-            request_data["parameters"]["safetySetting"] = request.safety_setting
+            parameters["safetySetting"] = request.safety_setting
         
         if request.seed is not None:
-            request_data["parameters"]["seed"] = request.seed
+            parameters["seed"] = request.seed
         
-        headers = {
-            "Authorization": f"Bearer {self.credentials.token}",
-            "Content-Type": "application/json"
+        request_data = {
+            "instances": [{"prompt": request.prompt}],
+            "parameters": parameters
         }
         
-        # 비동기 HTTP 요청
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None, 
-            lambda: requests.post(url, json=request_data, headers=headers, timeout=180)
-        )
+        headers = await self._ensure_token()
         
-        if response.status_code != 200:
-            error_message = f"HTTP {response.status_code}: {response.text}"
-            raise APIError(error_message, response.status_code)
+        body = _json_dumps(request_data)
         
-        return response.json()
+        # 비동기 HTTP 요청
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._post, url, body, headers
+        )
+    
+    def _post(self, url: str, body: bytes, headers: dict) -> dict:
+        """예측 요청 전송 및 응답 파싱 (스레드 풀에서 실행)"""
+        with self._session.post(
+            url, data=body, headers=headers, timeout=180
+        ) as response:
+            if response.status_code != 200:
+                error_message = f"HTTP {response.status_code}: {response.text}"
+                raise APIError(error_message, response.status_code)
+            
+            return _json_loads(response.content)
     
     def list_models(self) -> List[str]:
         """지원되는 모델 목록 반환"""
-        return self.SUPPORTED_MODELS.copy()
+        return list(_MODELS)
     
     def is_authenticated(self) -> bool:
         """인증 상태 확인"""
         return self.credentials is not None and self.credentials.valid
+    
+    def close(self) -> None:
+        """HTTP 세션, 연결 풀 및 스레드 풀 정리"""
+        self._executor.shutdown(wait=False)
+        self._session.close()
@@ -2,12 +2,138 @@
 데이터 모델들
 """
 
+import itertools
+import os
+import sys
+import threading
+import weakref
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Optional, Union
-from pathlib import Path
-import base64
+from typing import TYPE_CHECKING, Optional, Union
 
-@dataclass
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# 지원되는 가로세로 비율
+_ASPECT_RATIOS = ("1:1", "3:4", "4:3", "16:9", "9:16")
+_VALID_ASPECT_RATIOS = frozenset(_ASPECT_RATIOS)
+
+# save() 시 한 번에 디코딩할 base64 청크 크기 (4의 배수)
+_SAVE_CHUNK_SIZE = 64 * 1024
+
+# 생성을 확인한 저장 디렉토리 (save()마다 mkdir를 호출하지 않도록, 최대 개수까지만 보관)
+# 제거된 디렉토리는 다시 mkdir하면 되므로 한도를 넘으면 오래된 항목부터 버림
+_MAX_ENSURED_DIRS = 256
+_ENSURED_DIRS: "OrderedDict[Path, None]" = OrderedDict()
+_ENSURED_DIRS_LOCK = threading.Lock()
+
+def _ensure_dir(directory: "Path", force: bool = False) -> None:
+    """디렉토리가 없으면 생성 (확인된 디렉토리는 다시 확인하지 않음)"""
+    if not force and directory in _ENSURED_DIRS:
+        return
+    directory.mkdir(parents=True, exist_ok=True)
+    with _ENSURED_DIRS_LOCK:
+        _ENSURED_DIRS[directory] = None
+        _ENSURED_DIRS.move_to_end(directory)
+        while len(_ENSURED_DIRS) > _MAX_ENSURED_DIRS:
+            _ENSURED_DIRS.popitem(last=False)
+
+# save() 임시 파일 열기 플래그 (Windows에서는 바이너리 모드)
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+_temp_names = itertools.count()
+
+def _write_all(fd: int, data) -> None:
+    """버퍼링 없이 파일 디스크립터에 전체 데이터 기록 (부분 기록 시 반복)"""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+# base64 데이터에 섞일 수 있는 공백 문자
+_B64_WHITESPACE = b" \t\r\n"
+
+def _without_whitespace(data: bytes) -> bytes:
+    """base64 데이터의 공백 제거 (공백이 없으면 원본을 그대로 반환)"""
+    # 줄바꿈 개수가 4의 배수일 수도 있어 길이만으로는 판단할 수 없으므로 한 번에 제거
+    stripped = data.translate(None, _B64_WHITESPACE)
+    return data if len(stripped) == len(data) else stripped
+
+# base64 디코더 (첫 디코딩 시 로드)
+_b64decode = None
+
+def _decoder():
+    """
+    base64 디코더 지연 로딩
+    
+    pybase64가 있으면 사용하고, 없으면 base64 모듈의 래퍼를 거치지 않고
+    binascii.a2b_base64를 직접 사용 (API 응답은 항상 표준 base64)
+    """
+    global _b64decode
+    if _b64decode is None:
+        try:
+            from pybase64 import b64decode
+        except ImportError:
+            from binascii import a2b_base64 as b64decode
+        _b64decode = b64decode
+    return _b64decode
+
+# 디코딩된 이미지 데이터 캐시 (총 크기 제한 LRU, 이미지 객체가 사라지면 함께 제거)
+_MAX_CACHE_BYTES = 256 * 1024 * 1024
+_DECODE_CACHE: "OrderedDict[int, bytes]" = OrderedDict()
+_DECODE_CACHE_LOCK = threading.Lock()
+_decode_cache_bytes = 0
+_cache_keys = itertools.count()
+
+def _cache_get(key: int) -> Optional[bytes]:
+    """캐시된 디코딩 데이터 조회"""
+    with _DECODE_CACHE_LOCK:
+        data = _DECODE_CACHE.get(key)
+        if data is not None:
+            _DECODE_CACHE.move_to_end(key)
+        return data
+
+def _cache_put(key: int, data: bytes) -> bool:
+    """
+    디코딩 데이터 캐시에 저장 (한도를 넘으면 오래된 항목부터 제거)
+    
+    Returns:
+        bool: 캐시 저장 여부 (한도보다 큰 데이터는 저장하지 않음)
+    """
+    global _decode_cache_bytes
+    if len(data) > _MAX_CACHE_BYTES:
+        return False
+    
+    with _DECODE_CACHE_LOCK:
+        old = _DECODE_CACHE.pop(key, None)
+        if old is not None:
+            _decode_cache_bytes -= len(old)
+        _DECODE_CACHE[key] = data
+        _decode_cache_bytes += len(data)
+        
+        while _decode_cache_bytes > _MAX_CACHE_BYTES:
+            _, evicted = _DECODE_CACHE.popitem(last=False)
+            _decode_cache_bytes -= len(evicted)
+    return True
+
+def _cache_discard(key: int) -> None:
+    """캐시 항목 제거"""
+    global _decode_cache_bytes
+    with _DECODE_CACHE_LOCK:
+        data = _DECODE_CACHE.pop(key, None)
+        if data is not None:
+            _decode_cache_bytes -= len(data)
+
+def clear_image_cache() -> None:
+    """디코딩된 이미지 데이터 캐시 전체 비우기"""
+    global _decode_cache_bytes
+    with _DECODE_CACHE_LOCK:
+        _DECODE_CACHE.clear()
+        _decode_cache_bytes = 0
+
+# Python 3.10+ 에서는 dataclass가 __slots__를 생성
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_OPTIONS)
 class ImageRequest:
     """이미지 생성 요청"""
     prompt: str
@@ -21,44 +147,169 @@ class ImageRequest:
 
     def __post_init__(self):
         """입력 검증"""
-        if not self.prompt or not self.prompt.strip():
+        if not self.prompt or self.prompt.isspace():
             raise ValueError("프롬프트는 필수입니다")
         
         if self.count < 1 or self.count > 4:
             raise ValueError("이미지 개수는 1-4개여야 합니다")
         
-        valid_ratios = ["1:1", "3:4", "4:3", "16:9", "9:16"]
-        if self.aspect_ratio not in valid_ratios:
-            raise ValueError(f"지원되는 비율: {valid_ratios}")
+        if self.aspect_ratio not in _VALID_ASPECT_RATIOS:
+            raise ValueError(f"지원되는 비율: {list(_ASPECT_RATIOS)}")
 
 class GeneratedImage:
     """생성된 이미지"""
     
-    def __init__(self, base64_data: str, prompt: str, enhanced_prompt: str = None):
-        self.base64_data = base64_data
+    __slots__ = (
+        "_b64",
+        "prompt",
+        "enhanced_prompt",
+        "_cache_key",
+        "_finalizer",
+        "_size_cached",
+        "_repr_prefix",
+        "__weakref__",
+    )
+    
+    def __init__(
+        self,
+        base64_data: Union[str, bytes],
+        prompt: str,
+        enhanced_prompt: str = None
+    ):
+        # 디코딩 시 매번 str -> bytes 변환이 일어나지 않도록 bytes로 한 번만 변환해 보관
+        if isinstance(base64_data, str):
+            base64_data = base64_data.encode("ascii")
+        self._b64 = base64_data
         self.prompt = prompt
         self.enhanced_prompt = enhanced_prompt or prompt
-        self._image_data = None
+        self._reset_cache_state()
+    
+    def _reset_cache_state(self) -> None:
+        """캐시 키 및 파생 값 초기화 (새 캐시 키 발급)"""
+        self._cache_key = next(_cache_keys)
+        self._finalizer = None
+        self._size_cached: Optional[int] = None
+        self._repr_prefix = None
+    
+    def __getstate__(self) -> dict:
+        # 캐시 키는 프로세스/객체마다 다르므로 pickle/copy 대상에서 제외
+        return {
+            "_b64": self._b64,
+            "prompt": self.prompt,
+            "enhanced_prompt": self.enhanced_prompt,
+        }
+    
+    def __setstate__(self, state: dict) -> None:
+        self._b64 = state["_b64"]
+        self.prompt = state["prompt"]
+        self.enhanced_prompt = state["enhanced_prompt"]
+        self._reset_cache_state()
+    
+    @property
+    def base64_data(self) -> str:
+        """
+        base64 인코딩된 이미지 데이터
+        
+        내부에는 bytes로 보관하므로 접근할 때마다 전체 데이터 크기의 str을 새로 만듦
+        """
+        return self._b64.decode("ascii")
+    
+    @base64_data.setter
+    def base64_data(self, value: Union[str, bytes]) -> None:
+        if isinstance(value, str):
+            value = value.encode("ascii")
+        
+        # 이전 데이터의 디코딩 캐시와 파생 값 정리
+        _cache_discard(self._cache_key)
+        if self._finalizer is not None:
+            self._finalizer.detach()
+        self._b64 = value
+        self._reset_cache_state()
         
     @property 
     def image_data(self) -> bytes:
-        """이미지 바이너리 데이터"""
-        if self._image_data is None:
-            self._image_data = base64.b64decode(self.base64_data)
-        return self._image_data
+        """이미지 바이너리 데이터 (디코딩 결과는 크기 제한 캐시에 보관)"""
+        data = _cache_get(self._cache_key)
+        if data is None:
+            data = _decoder()(self._b64)
+            self._remember(data)
+        return data
+    
+    def _remember(self, data: bytes) -> None:
+        """디코딩 데이터를 캐시에 저장하고, 객체가 사라질 때 캐시에서 제거되도록 등록"""
+        if _cache_put(self._cache_key, data) and self._finalizer is None:
+            self._finalizer = weakref.finalize(self, _cache_discard, self._cache_key)
     
     @property
     def size(self) -> int:
-        """이미지 크기 (bytes)"""
-        return len(self.image_data)
+        """이미지 크기 (bytes) - 디코딩 없이 base64 길이로 계산"""
+        if self._size_cached is None:
+            data = _cache_get(self._cache_key)
+            if data is not None:
+                self._size_cached = len(data)
+            else:
+                data = _without_whitespace(self._b64)
+                self._size_cached = (len(data) // 4) * 3 - data.count(b"=", -2)
+        return self._size_cached
     
-    def save(self, path: Union[str, Path]) -> None:
+    def save(self, path: Union[str, "Path"]) -> None:
         """이미지 저장"""
+        from pathlib import Path
+        
         path = Path(path)
-        path.parent.mkdir(parents=True, exist_ok=True)
+        _ensure_dir(path.parent)
         
-        with open(path, "wb") as f:
-            f.write(self.image_data)
+        # 디코딩에 실패해도 기존 파일이 남도록 같은 디렉토리의 임시 파일에 기록 후 교체
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.{next(_temp_names)}.tmp")
+        try:
+            fd = os.open(temp_path, _WRITE_FLAGS, 0o666)
+        except FileNotFoundError:
+            # 확인 이후 디렉토리가 삭제된 경우 다시 생성
+            _ensure_dir(path.parent, force=True)
+            fd = os.open(temp_path, _WRITE_FLAGS, 0o666)
+        
+        try:
+            try:
+                data = _cache_get(self._cache_key)
+                if data is not None:
+                    _write_all(fd, data)
+                else:
+                    # 전체 이미지를 메모리에 만들지 않고 청크 단위로 디코딩해 기록
+                    self._write_decoded(fd)
+            finally:
+                os.close(fd)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+    
+    def _write_decoded(self, fd: int) -> None:
+        """base64 데이터를 청크 단위로 디코딩해 파일에 기록"""
+        from binascii import a2b_base64
+        
+        # 청크 경계가 4바이트 단위로 맞도록 공백 제거
+        data = _without_whitespace(self._b64)
+        
+        view = memoryview(data)
+        for start in range(0, len(view), _SAVE_CHUNK_SIZE):
+            _write_all(fd, a2b_base64(view[start:start + _SAVE_CHUNK_SIZE]))
+    
+    async def save_async(self, path: Union[str, "Path"]) -> None:
+        """이미지 저장 (디코딩/파일 기록을 스레드에서 실행해 이벤트 루프를 막지 않음)"""
+        import asyncio
+        
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.save, path)
+    
+    async def get_image_data_async(self) -> bytes:
+        """이미지 바이너리 데이터 (디코딩을 스레드에서 실행)"""
+        import asyncio
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: self.image_data)
     
     def show(self):
         """이미지 표시 (Jupyter/IPython에서)"""
@@ -70,12 +321,19 @@ class GeneratedImage:
             
     @classmethod
     def from_api_response(cls, prediction: dict) -> "GeneratedImage":
-        """API 응답에서 이미지 객체 생성"""
-        return cls(
-            base64_data=prediction["bytesBase64Encoded"],
-            prompt=prediction.get("prompt", ""),
-            enhanced_prompt=prediction.get("prompt")
-        )
+        """API 응답에서 이미지 객체 생성 (하위 클래스용, 일반적으로 make_generated_image 사용)"""
+        prompt = prediction.get("prompt")
+        return cls(prediction["bytesBase64Encoded"], prompt or "", prompt)
     
     def __repr__(self):
-        return f"GeneratedImage(prompt='{self.prompt[:30]}...', size={self.size:,} bytes)"
+        # 프롬프트 요약은 프롬프트가 바뀌지 않는 한 재사용
+        cached = self._repr_prefix
+        if cached is None or cached[0] is not self.prompt:
+            cached = (self.prompt, f"GeneratedImage(prompt='{self.prompt[:30]}...'")
+            self._repr_prefix = cached
+        return f"{cached[1]}, size={self.size:,} bytes)"
+
+def make_generated_image(prediction: dict) -> GeneratedImage:
+    """API 응답에서 이미지 객체 생성 (classmethod 호출 비용 없는 경로)"""
+    prompt = prediction.get("prompt")
+    return GeneratedImage(prediction["bytesBase64Encoded"], prompt or "", prompt)
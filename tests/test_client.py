@@ -0,0 +1,228 @@
+"""
+클라이언트 테스트 (네트워크 없이 가짜 인증 정보 사용)
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from vertex_ai_imagen import GeneratedImage, ImagenClient
+from vertex_ai_imagen.exceptions import APIError
+
+
+class FakeCredentials:
+    """refresh() 호출 횟수를 기록하는 가짜 인증 정보"""
+
+    def __init__(self):
+        self.valid = False
+        self.expired = True
+        self.token = None
+        self.refresh_count = 0
+
+    def refresh(self, request):
+        time.sleep(0.01)
+        self.refresh_count += 1
+        self.token = f"token-{self.refresh_count}"
+        self.valid = True
+        self.expired = False
+
+    def expire(self):
+        self.valid = False
+        self.expired = True
+
+
+def make_client() -> ImagenClient:
+    client = ImagenClient("test-project")
+    client.credentials = FakeCredentials()
+    return client
+
+
+async def ensure_token_concurrently(client: ImagenClient, count: int = 3):
+    return await asyncio.gather(*(client._ensure_token() for _ in range(count)))
+
+
+def test_concurrent_calls_share_one_refresh():
+    client = make_client()
+    try:
+        headers = asyncio.run(ensure_token_concurrently(client))
+    finally:
+        client.close()
+
+    assert client.credentials.refresh_count == 1
+    assert all(h["Authorization"] == "Bearer token-1" for h in headers)
+
+
+def test_client_reused_across_event_loops():
+    client = make_client()
+    try:
+        asyncio.run(ensure_token_concurrently(client))
+        client.credentials.expire()
+        headers = asyncio.run(ensure_token_concurrently(client))
+    finally:
+        client.close()
+
+    assert client.credentials.refresh_count == 2
+    assert headers[0]["Authorization"] == "Bearer token-2"
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def test_post_returns_full_response_document():
+    body = (
+        b'{"predictions": [{"bytesBase64Encoded": "aGk=", "score": 0.5}],'
+        b' "metadata": {"model": "m"}}'
+    )
+    client = make_client()
+    client._session.post = lambda *args, **kwargs: FakeResponse(body)
+    try:
+        result = client._post("https://example.invalid", b"{}", {})
+    finally:
+        client.close()
+
+    assert result == {
+        "predictions": [{"bytesBase64Encoded": "aGk=", "score": 0.5}],
+        "metadata": {"model": "m"},
+    }
+    assert isinstance(result["predictions"][0]["score"], float)
+
+
+def test_subclass_with_extra_model_gets_predict_url():
+    class ExtendedClient(ImagenClient):
+        SUPPORTED_MODELS = ImagenClient.SUPPORTED_MODELS | {"imagen-4.0-generate-001"}
+
+    client = ExtendedClient("test-project")
+    try:
+        assert client._model_urls["imagen-4.0-generate-001"] == (
+            "https://us-central1-aiplatform.googleapis.com/v1/projects/test-project/"
+            "locations/us-central1/publishers/google/models/"
+            "imagen-4.0-generate-001:predict"
+        )
+    finally:
+        client.close()
+
+
+def make_recording_client():
+    """요청 본문을 기록하고 시드를 프롬프트로 돌려주는 가짜 세션을 쓰는 클라이언트"""
+    client = make_client()
+    bodies = []
+
+    def post(url, data=None, headers=None, timeout=None):
+        request = json.loads(data)
+        bodies.append(request)
+        seed = request["parameters"].get("seed")
+        return FakeResponse(json.dumps({
+            "predictions": [{"bytesBase64Encoded": "aGk=", "prompt": f"seed-{seed}"}]
+        }).encode())
+
+    client._session.post = post
+    return client, bodies
+
+
+@pytest.mark.parametrize("seed, expected", [(5, [5, 6]), (0, [0, 1])])
+def test_parallel_generate_offsets_seeds(seed, expected):
+    client, bodies = make_recording_client()
+    try:
+        images = asyncio.run(
+            client.generate("test", count=2, seed=seed, parallel=True)
+        )
+    finally:
+        client.close()
+
+    assert isinstance(images, list)
+    assert all(isinstance(image, GeneratedImage) for image in images)
+    assert [image.prompt for image in images] == [f"seed-{s}" for s in expected]
+    assert sorted(body["parameters"]["seed"] for body in bodies) == expected
+    assert all(body["parameters"]["sampleCount"] == 1 for body in bodies)
+
+
+def test_parallel_generate_without_seed_sends_no_seed():
+    client, bodies = make_recording_client()
+    try:
+        images = asyncio.run(client.generate("test", count=3, parallel=True))
+    finally:
+        client.close()
+
+    assert len(images) == 3
+    assert all("seed" not in body["parameters"] for body in bodies)
+
+
+def test_parallel_generate_cancels_pending_requests_on_error():
+    client = make_client()
+    cancelled = []
+
+    async def call_api(request):
+        if request.seed == 0:
+            raise APIError("failed")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(request.seed)
+            raise
+
+    async def main():
+        with pytest.raises(APIError):
+            await client.generate("test", count=3, seed=0, parallel=True)
+        # asyncio.run() 종료 시의 정리가 아니라 generate() 안에서 취소되어야 함
+        return sorted(cancelled)
+
+    client._call_api = call_api
+    try:
+        assert asyncio.run(main()) == [1, 2]
+    finally:
+        client.close()
+
+
+def test_default_max_connections_matches_default_executor():
+    client = ImagenClient("test-project")
+    try:
+        assert client.max_connections == min(32, (os.cpu_count() or 1) + 4)
+    finally:
+        client.close()
+
+
+def test_max_connections_must_be_positive():
+    with pytest.raises(ValueError):
+        ImagenClient("test-project", max_connections=0)
+
+
+def test_max_connections_limits_concurrent_requests():
+    client = ImagenClient("test-project", max_connections=2)
+    client.credentials = FakeCredentials()
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def post(url, data=None, headers=None, timeout=None):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return FakeResponse(b'{"predictions": [{"bytesBase64Encoded": "aGk="}]}')
+
+    client._session.post = post
+    try:
+        images = asyncio.run(client.generate("test", count=4, parallel=True))
+    finally:
+        client.close()
+
+    assert client.max_connections == 2
+    assert len(images) == 4
+    assert peak == 2
@@ -0,0 +1,225 @@
+"""
+데이터 모델 테스트
+"""
+
+import base64
+import binascii
+import copy
+import gc
+import pickle
+
+import pytest
+
+from vertex_ai_imagen import models
+from vertex_ai_imagen.models import GeneratedImage, ImageRequest
+
+
+def make_image(data: bytes, prompt: str = "test") -> GeneratedImage:
+    return GeneratedImage(base64.b64encode(data), prompt)
+
+
+def test_pickle_gets_fresh_cache_key():
+    original = make_image(b"own payload")
+    restored = pickle.loads(pickle.dumps(original))
+
+    assert restored._cache_key != original._cache_key
+    assert restored._finalizer is None
+    assert restored.image_data == b"own payload"
+
+
+def test_unpickled_image_does_not_read_other_cache_entry():
+    original = make_image(b"own payload")
+    payload = pickle.dumps(original)
+
+    # 다른 프로세스에서 같은 키가 이미 사용된 상황 재현
+    models._cache_put(original._cache_key, b"OTHER")
+    try:
+        restored = pickle.loads(payload)
+        assert restored.image_data == b"own payload"
+    finally:
+        models._cache_discard(original._cache_key)
+
+
+def test_copy_and_deepcopy_get_fresh_cache_key():
+    original = make_image(b"payload")
+    original.image_data
+
+    for clone in (copy.copy(original), copy.deepcopy(original)):
+        assert clone._cache_key != original._cache_key
+        assert clone._finalizer is None
+        assert clone.prompt == original.prompt
+        assert clone.image_data == b"payload"
+
+
+def test_size_matches_decoded_length():
+    for length in (0, 1, 2, 3, 4, 5, 1000):
+        data = bytes(range(256)) * 4
+        image = make_image(data[:length])
+        assert image.size == length
+
+
+def test_size_ignores_line_breaks_in_payload():
+    data = bytes(range(256)) * 400
+    image = GeneratedImage(base64.encodebytes(data), "test")
+
+    assert image.size == len(data)
+
+
+def test_repr_does_not_decode():
+    models.clear_image_cache()
+    image = make_image(b"x" * 1000, prompt="a very long prompt " * 5)
+
+    text = repr(image)
+
+    assert not models._DECODE_CACHE
+    assert models._cache_get(image._cache_key) is None
+    assert text == f"GeneratedImage(prompt='{image.prompt[:30]}...', size=1,000 bytes)"
+
+
+def test_base64_data_setter_resets_derived_state():
+    image = make_image(b"old", prompt="prompt")
+    old_key = image._cache_key
+    assert image.image_data == b"old"
+    repr(image)
+
+    image.base64_data = base64.b64encode(b"new payload").decode("ascii")
+
+    assert models._cache_get(old_key) is None
+    assert image.base64_data == base64.b64encode(b"new payload").decode("ascii")
+    assert image.size == len(b"new payload")
+    assert image.image_data == b"new payload"
+    assert "size=11 bytes" in repr(image)
+
+
+def test_image_request_rejects_unsupported_aspect_ratio():
+    ImageRequest(prompt="test", aspect_ratio="16:9")
+    with pytest.raises(ValueError, match=r"\['1:1', '3:4', '4:3', '16:9', '9:16'\]"):
+        ImageRequest(prompt="test", aspect_ratio="2:1")
+
+
+def test_save_round_trip(tmp_path):
+    path = tmp_path / "nested" / "image.png"
+    make_image(b"\x89PNG payload").save(path)
+
+    assert path.read_bytes() == b"\x89PNG payload"
+    assert [p.name for p in path.parent.iterdir()] == ["image.png"]
+
+
+def test_save_decodes_multiple_chunks(tmp_path):
+    data = bytes(range(256)) * 1000
+    image = make_image(data)
+    assert len(image.base64_data) > models._SAVE_CHUNK_SIZE
+
+    image.save(tmp_path / "image.png")
+
+    assert (tmp_path / "image.png").read_bytes() == data
+
+
+def test_save_handles_line_breaks_in_payload(tmp_path):
+    data = bytes(range(256)) * 400
+    image = GeneratedImage(base64.encodebytes(data), "test")
+
+    image.save(tmp_path / "image.png")
+
+    assert (tmp_path / "image.png").read_bytes() == data
+
+
+def test_save_with_cached_data_overwrites_file(tmp_path):
+    path = tmp_path / "image.png"
+    path.write_bytes(b"old image, longer than the new one")
+    image = make_image(b"new")
+    image.image_data
+
+    image.save(path)
+
+    assert path.read_bytes() == b"new"
+
+
+def test_invalid_payload_leaves_existing_file_untouched(tmp_path):
+    path = tmp_path / "image.png"
+    path.write_bytes(b"existing image")
+
+    with pytest.raises(binascii.Error):
+        GeneratedImage("abc", "test").save(path)
+
+    assert path.read_bytes() == b"existing image"
+    assert [p.name for p in tmp_path.iterdir()] == ["image.png"]
+
+
+@pytest.fixture
+def small_cache(monkeypatch):
+    models.clear_image_cache()
+    monkeypatch.setattr(models, "_MAX_CACHE_BYTES", 10)
+    yield
+    models.clear_image_cache()
+
+
+def test_cache_evicts_least_recently_used(small_cache):
+    first = make_image(b"aaaa")
+    second = make_image(b"bbbb")
+    third = make_image(b"cccc")
+
+    first.image_data
+    second.image_data
+    first.image_data  # first가 가장 최근 사용
+    third.image_data
+
+    assert models._cache_get(second._cache_key) is None
+    assert models._cache_get(first._cache_key) == b"aaaa"
+    assert models._cache_get(third._cache_key) == b"cccc"
+    assert models._decode_cache_bytes == 8
+
+
+def test_oversized_payload_is_never_cached(small_cache):
+    image = make_image(b"x" * 11)
+
+    assert image.image_data == b"x" * 11
+    assert models._cache_get(image._cache_key) is None
+    assert image._finalizer is None
+    assert models._decode_cache_bytes == 0
+
+
+def test_cache_entry_removed_when_image_is_collected(small_cache):
+    image = make_image(b"data")
+    image.image_data
+    key = image._cache_key
+    assert models._cache_get(key) == b"data"
+
+    del image
+    gc.collect()
+
+    assert models._cache_get(key) is None
+    assert models._decode_cache_bytes == 0
+
+
+def test_clear_image_cache_resets_byte_count(small_cache):
+    image = make_image(b"data")
+    image.image_data
+    assert models._decode_cache_bytes == 4
+
+    models.clear_image_cache()
+
+    assert not models._DECODE_CACHE
+    assert models._decode_cache_bytes == 0
+    assert image.image_data == b"data"
+
+
+def test_ensured_dirs_are_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(models, "_MAX_ENSURED_DIRS", 2)
+    monkeypatch.setattr(models, "_ENSURED_DIRS", models.OrderedDict())
+
+    for name in ("a", "b", "c"):
+        make_image(b"data").save(tmp_path / name / "image.png")
+
+    assert list(models._ENSURED_DIRS) == [tmp_path / "b", tmp_path / "c"]
+
+    # 목록에서 빠진 디렉토리도 다시 생성해 저장
+    make_image(b"data").save(tmp_path / "a" / "again.png")
+    assert (tmp_path / "a" / "again.png").read_bytes() == b"data"
+
+
+def test_without_whitespace_strips_every_whitespace_kind():
+    assert models._without_whitespace(b"QU\r\nJD\tRE Y=\n") == b"QUJDREY="
+
+    data = b"QUJDREVG"
+    assert models._without_whitespace(data) is data